@@ -1,483 +1,1495 @@
-"""
-career_path_advisor.py
-AI-Powered Career Path Advisor for Tech Careers
-
-This is a beginner-friendly multi-agent system that helps users plan their tech career.
-It uses 3 AI agents working together:
-1. Profile Agent - Asks questions to understand your background and goals
-2. Research Agent - Searches Microsoft Learn for courses and certifications
-3. Advisor Agent - Creates a personalized learning roadmap
-
-Technology Stack:
-- Azure OpenAI GPT-4o (the AI brain)
-- Microsoft Learn (knowledge source)
-- Python asyncio (for concurrent operations)
-"""
-
-# ============================================================================
-# IMPORTS - External libraries we need
-# ============================================================================
-
-import os          # For reading environment variables
-import asyncio     # For asynchronous (non-blocking) operations
-from typing import Any, Dict  # For type hints (makes code clearer)
-from dotenv import load_dotenv  # For loading .env file securely
-
-# Microsoft Agent Framework - handles AI agent orchestration
-from agent_framework import ChatAgent
-from agent_framework.azure import AzureOpenAIChatClient
-from agent_framework import MCPStreamableHTTPTool
-
-
-# ============================================================================
-# CONFIGURATION - Load credentials from .env file
-# ============================================================================
-
-# Load environment variables from .env file (keeps secrets secure)
-load_dotenv()
-
-# Read Azure OpenAI credentials from environment variables
-AZURE_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-AZURE_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
-DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
-API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview")
-
-# Validate that all required credentials are present
-# This prevents cryptic errors later if something is missing
-if not AZURE_ENDPOINT:
-    raise ValueError("AZURE_OPENAI_ENDPOINT not found in .env file")
-if not AZURE_API_KEY:
-    raise ValueError("AZURE_OPENAI_API_KEY not found in .env file")
-if not DEPLOYMENT_NAME:
-    raise ValueError("AZURE_OPENAI_DEPLOYMENT_NAME not found in .env file")
-
-
-# ============================================================================
-# MAIN CLASS - The Career Path Advisor System
-# ============================================================================
-
-class CareerPathAdvisor:
-    """
-    Main class that orchestrates the 3-agent system.
-    
-    Think of this as the "manager" that coordinates:
-    - Profile Agent (asks questions)
-    - Research Agent (searches Microsoft Learn)
-    - Advisor Agent (creates roadmap)
-    """
-    
-    def __init__(self):
-        """
-        Initialize the advisor system.
-        Sets up the AI client, Microsoft Learn connection, and 3 agents.
-        """
-        
-        # ===== STEP 1: Create Azure OpenAI client =====
-        # This is how we communicate with GPT-4o
-        self.chat_client = AzureOpenAIChatClient(
-            deployment_name=DEPLOYMENT_NAME,  # Which model to use
-            endpoint=AZURE_ENDPOINT,          # Where to send requests
-            api_key=AZURE_API_KEY,           # Authentication
-            api_version=API_VERSION          # API version
-        )
-        
-        # ===== STEP 2: Create Microsoft Learn MCP tool =====
-        # MCP = Model Context Protocol
-        # This lets our agents search Microsoft Learn documentation
-        self.mslearn_mcp = MCPStreamableHTTPTool(
-            name="microsoft_learn",
-            url="https://learn.microsoft.com/api/mcp",
-            timeout=30,           # Wait max 30 seconds for response
-            request_timeout=30,   # Same timeout for requests
-        )
-        
-        # ===== STEP 3: Create the 3 specialized agents =====
-        self.profile_agent = self._create_profile_agent()
-        self.research_agent = self._create_research_agent()
-        self.advisor_agent = self._create_advisor_agent()
-        
-        # ===== STEP 4: Initialize conversation context =====
-        # Stores the conversation history to avoid repeating questions
-        self._profile_context = []
-        
-        # Storage for the final outputs of each agent
-        self.context: Dict[str, Any] = {
-            "user_profile": {},         # Profile Agent's output
-            "learning_resources": [],   # Research Agent's output
-            "career_roadmap": ""        # Advisor Agent's output
-        }
-    
-    
-    # ========================================================================
-    # AGENT 1: PROFILE AGENT
-    # Purpose: Understand the user's career goals and background
-    # ========================================================================
-    
-    def _create_profile_agent(self) -> ChatAgent:
-        """
-        Creates the Profile Agent with specific instructions.
-        
-        This agent asks questions to understand:
-        - What career you want
-        - Your current skill level
-        - What you already know
-        - How much time you have
-        - Your target timeline
-        """
-        return ChatAgent(
-            chat_client=self.chat_client,
-            name="ProfileAgent",
-            
-            # Instructions tell the AI how to behave
-            # This is called "prompt engineering"
-            instructions="""
-You gather information about the user's career goals and background.
-
-Extract 5 key items:
-1. Career goal (cloud developer, data scientist, DevOps engineer, etc.)
-2. Current level (beginner/intermediate/advanced)
-3. Current skills (languages/tools they know)
-4. Time commitment (hours per week)
-5. Target timeline (3 months, 6 months, 1 year, etc.)
-
-If user provided all 5:
-PROFILE_COMPLETE
-- Goal: [career goal]
-- Level: [current level]
-- Skills: [current skills]
-- Time: [hours per week]
-- Timeline: [target timeline]
-
-If missing info, ask ONE relevant question:
-- "What tech career are you interested in?"
-- "What's your current experience level? (beginner/intermediate/advanced)"
-- "What programming languages or tools do you already know?"
-- "How many hours per week can you dedicate to learning?"
-- "What's your target timeline? (3 months, 6 months, 1 year)"
-
-RULES:
-- Ask ONLY ONE question per response
-- Be conversational but concise
-- Maximum 2 lines per response
-- No explanations, just ask what you need
-            """,
-        )
-    
-    
-    # ========================================================================
-    # AGENT 2: RESEARCH AGENT
-    # Purpose: Search Microsoft Learn for relevant courses and certifications
-    # ========================================================================
-    
-    def _create_research_agent(self) -> ChatAgent:
-        """
-        Creates the Research Agent with Microsoft Learn search capability.
-        
-        This agent:
-        - Searches Microsoft Learn documentation
-        - Finds courses, certifications, labs
-        - Returns structured data about each resource
-        """
-        return ChatAgent(
-            chat_client=self.chat_client,
-            name="ResearchAgent",
-            
-            instructions="""
-Search Microsoft Learn for learning resources matching the user's career goal.
-
-Find resources in these categories:
-1. Foundational courses (for beginners)
-2. Intermediate modules (skill building)
-3. Advanced topics (specialization)
-4. Certifications (career milestones)
-5. Hands-on labs (practical experience)
-
-Output format:
-
-RESOURCE: [title]
-TYPE: [course/module/certification/lab]
-LEVEL: [beginner/intermediate/advanced]
-DURATION: [estimated time]
-DOCS: [url]
----
-
-Find 5-7 resources total. NO other text.
-
-RULES:
-- Cover different skill levels
-- Include at least one certification path
-- Include hands-on labs when available
-- Keep output structured and clean
-            """,
-            
-            # IMPORTANT: This agent gets the MCP tool to search Microsoft Learn
-            tools=[self.mslearn_mcp],
-        )
-    
-    
-    # ========================================================================
-    # AGENT 3: ADVISOR AGENT
-    # Purpose: Create a personalized learning roadmap
-    # ========================================================================
-    
-    def _create_advisor_agent(self) -> ChatAgent:
-        """
-        Creates the Advisor Agent that builds the final roadmap.
-        
-        This agent:
-        - Takes the user profile (from Agent 1)
-        - Takes the learning resources (from Agent 2)
-        - Creates a phased learning plan with realistic timelines
-        """
-        return ChatAgent(
-            chat_client=self.chat_client,
-            name="AdvisorAgent",
-            
-            instructions="""
-Create a personalized learning roadmap based on user profile and available resources.
-
-Output format:
-
-**YOUR CAREER PATH: [Career Goal]**
-
-**PHASE 1: FOUNDATION (Months 1-2)**
-- [Resource 1]: [Why important - 10 words max]
-- [Resource 2]: [Why important - 10 words max]
-- Estimated time: [X hours]
-
-**PHASE 2: SKILL BUILDING (Months 3-4)**
-- [Resource 3]: [Why important - 10 words max]
-- [Resource 4]: [Why important - 10 words max]
-- Estimated time: [X hours]
-
-**PHASE 3: SPECIALIZATION (Months 5-6)**
-- [Resource 5]: [Why important - 10 words max]
-- [Resource 6]: [Why important - 10 words max]
-- Estimated time: [X hours]
-
-**CERTIFICATION TARGET**
-- [Certification name]: [Why valuable - 15 words max]
-- Exam link: [url]
-
-**WEEKLY COMMITMENT**
-Based on [X] hours/week: [Realistic timeline assessment]
-
-**NEXT STEPS**
-1. [Immediate action - 12 words max]
-2. [First resource to start - 12 words max]
-3. [How to track progress - 12 words max]
-
-RULES:
-- Adapt phases to user's timeline
-- Be realistic about time commitments
-- Prioritize beginner resources if they're new
-- Always include certification goal
-- Keep each point under word limits
-- No fluff, just actionable advice
-            """,
-        )
-    
-    
-    # ========================================================================
-    # WORKFLOW METHODS - How the agents work together
-    # ========================================================================
-    
-    async def gather_profile(self, user_input: str) -> str:
-        """
-        Step 1: Use Profile Agent to gather user information.
-        
-        Args:
-            user_input: What the user typed
-            
-        Returns:
-            The agent's response (either a question or PROFILE_COMPLETE)
-        """
-        print("\n[1/3] UNDERSTANDING YOUR GOALS...")
-        
-        # Add user input to conversation history
-        # This helps the agent remember what was already asked
-        self._profile_context.append(f"User: {user_input}")
-        full_context = "\n".join(self._profile_context)
-        
-        # Send the full conversation to the agent
-        response = await self.profile_agent.run(full_context)
-        
-        # Add agent's response to history
-        self._profile_context.append(f"Agent: {response.text}")
-        
-        return response.text
-    
-    async def research_learning_path(self, profile: str) -> str:
-        """
-        Step 2: Use Research Agent to find learning resources.
-        
-        Args:
-            profile: The complete user profile from Agent 1
-            
-        Returns:
-            Structured list of courses, certifications, and labs
-        """
-        print("\n[2/3] FINDING LEARNING RESOURCES...")
-        
-        # Create a search query for the Research Agent
-        research_query = f"""
-User Profile:
-{profile}
-
-Search Microsoft Learn for learning resources, courses, certifications, and labs 
-that match this career goal and experience level.
-        """
-        
-        # The Research Agent will use the MCP tool to search Microsoft Learn
-        response = await self.research_agent.run(research_query)
-        return response.text
-    
-    async def create_roadmap(self, profile: str, resources: str) -> str:
-        """
-        Step 3: Use Advisor Agent to create personalized roadmap.
-        
-        Args:
-            profile: User profile from Agent 1
-            resources: Learning resources from Agent 2
-            
-        Returns:
-            Personalized learning roadmap with phases and timelines
-        """
-        print("\n[3/3] CREATING YOUR PERSONALIZED ROADMAP...")
-        
-        # Combine profile and resources for the Advisor Agent
-        roadmap_query = f"""
-USER PROFILE:
-{profile}
-
-AVAILABLE RESOURCES:
-{resources}
-
-Create a personalized learning roadmap with realistic timelines.
-        """
-        
-        # The Advisor Agent synthesizes everything into a roadmap
-        response = await self.advisor_agent.run(roadmap_query)
-        return response.text
-    
-    async def _cleanup_mcp(self):
-        """
-        Clean up Microsoft Learn MCP connection after we're done.
-        
-        This prevents the annoying async cleanup errors you might see.
-        It's good practice to close connections properly.
-        """
-        try:
-            # Wait a moment for any pending operations
-            await asyncio.sleep(0.5)
-            
-            # Try to close the MCP tool gracefully
-            if hasattr(self.mslearn_mcp, 'close'):
-                await self.mslearn_mcp.close()
-            elif hasattr(self.mslearn_mcp, '__aexit__'):
-                await self.mslearn_mcp.__aexit__(None, None, None)
-        except Exception:
-            # If cleanup fails, that's okay - just ignore it
-            pass
-    
-    
-    # ========================================================================
-    # MAIN INTERACTIVE SESSION - Brings it all together
-    # ========================================================================
-    
-    async def run_interactive_session(self):
-        """
-        Main workflow that orchestrates all 3 agents.
-        
-        Flow:
-        1. Profile Agent asks questions → gathers user profile
-        2. Research Agent searches Microsoft Learn → finds resources
-        3. Advisor Agent creates roadmap → personalized learning path
-        """
-        
-        # ===== Welcome message =====
-        print("\n" + "="*70)
-        print("🎯 CAREER PATH ADVISOR - Powered by Microsoft Learn")
-        print("="*70)
-        print("\nLet's plan your tech career journey!\n")
-        
-        # ===== PHASE 1: Gather Profile =====
-        # Ask the initial question
-        user_input = input("What tech career are you interested in? ")
-        
-        profile_text = ""
-        # Allow up to 5 exchanges (question + answer pairs)
-        for i in range(5):
-            # Get response from Profile Agent
-            profile_response = await self.gather_profile(user_input)
-            print(f"\n{profile_response}")
-            
-            # Check if we have all the info we need
-            if "PROFILE_COMPLETE" in profile_response:
-                profile_text = profile_response
-                break
-            
-            # Ask for more input
-            user_input = input("\n> ")
-            if not user_input.strip():
-                break
-        
-        # Fallback: use last response if we didn't get PROFILE_COMPLETE
-        if not profile_text:
-            profile_text = profile_response
-        
-        # Store the profile
-        self.context["user_profile"] = profile_text
-        
-        # ===== PHASE 2: Research Learning Resources =====
-        # Research Agent searches Microsoft Learn
-        learning_resources = await self.research_learning_path(profile_text)
-        print(f"\n{learning_resources}")
-        self.context["learning_resources"] = learning_resources
-        
-        # ===== PHASE 3: Create Personalized Roadmap =====
-        # Advisor Agent creates the final learning plan
-        career_roadmap = await self.create_roadmap(profile_text, learning_resources)
-        print(f"\n{career_roadmap}")
-        self.context["career_roadmap"] = career_roadmap
-        
-        # ===== Success message =====
-        print("\n" + "="*70)
-        print("✅ YOUR PERSONALIZED LEARNING PATH IS READY!")
-        print("="*70)
-        print("\n💡 Tip: Bookmark the resource links and start with Phase 1!")
-        
-        # Clean up connections
-        await self._cleanup_mcp()
-
-
-# ============================================================================
-# PROGRAM ENTRY POINT
-# ============================================================================
-
-async def main():
-    """
-    Main function that runs the career advisor.
-    
-    This is the entry point when you run: python career_path_advisor.py
-    """
-    try:
-        # Create the advisor system
-        advisor = CareerPathAdvisor()
-        
-        # Run the interactive session
-        await advisor.run_interactive_session()
-            
-    except KeyboardInterrupt:
-        # Handle Ctrl+C gracefully
-        print("\n\n👋 Good luck on your learning journey!")
-    except Exception as e:
-        # Handle any other errors
-        print(f"\n❌ Error: {e}")
-
-
-# This ensures main() only runs when executing this file directly
-# (not when importing it as a module)
-if __name__ == "__main__":
-    # asyncio.run() is how we run async functions in Python
-    asyncio.run(main())
+"""
+career_path_advisor.py
+AI-Powered Career Path Advisor for Tech Careers
+
+This is a beginner-friendly multi-agent system that helps users plan their tech career.
+It uses 3 AI agents working together:
+1. Profile Agent - Asks questions to understand your background and goals
+2. Research Agent - Searches Microsoft Learn for courses and certifications
+3. Advisor Agent - Creates a personalized learning roadmap
+
+Technology Stack:
+- Azure OpenAI GPT-4o (the AI brain)
+- Microsoft Learn (knowledge source)
+- Python asyncio (for concurrent operations)
+"""
+
+# ============================================================================
+# IMPORTS - External libraries we need
+# ============================================================================
+
+import os          # For reading environment variables
+import sys         # For flushing streamed tokens to stdout
+import re          # For extracting profile fields from agent output
+import json        # For building stable cache keys
+import hashlib     # For hashing cache keys
+import time        # For measuring how long cacheable calls take
+import random      # For jitter on retry backoff
+import asyncio     # For asynchronous (non-blocking) operations
+import functools   # For caching the shared Azure OpenAI client
+from collections import deque  # Bounded conversation history
+from dataclasses import dataclass, field, asdict  # Session result record
+from pathlib import Path  # For writing session files
+from uuid import uuid4    # Unique file name per session
+from typing import Any, Dict, Optional  # For type hints (makes code clearer)
+from dotenv import load_dotenv  # For loading .env file securely
+
+import orjson      # C-accelerated JSON for persisting session results
+import structlog   # Structured logs (phase latencies, cache hits)
+
+import diskcache   # Persistent on-disk cache for agent responses
+import numpy as np  # For cosine-similarity scans over cached embeddings
+
+# Direct Azure OpenAI client, used only for embeddings (the agents go
+# through the agent-framework chat client)
+from openai import (
+    AsyncAzureOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+# uvloop is a faster drop-in event loop (Linux/macOS only), so we treat
+# it as a nice-to-have rather than a hard requirement
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Microsoft Agent Framework - handles AI agent orchestration
+from agent_framework import ChatAgent
+from agent_framework.azure import AzureOpenAIChatClient
+from agent_framework import MCPStreamableHTTPTool
+
+
+# ============================================================================
+# CONFIGURATION - Load credentials from .env file
+# ============================================================================
+
+# Load environment variables from .env file (keeps secrets secure)
+load_dotenv()
+
+# Read Azure OpenAI credentials from environment variables
+AZURE_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+AZURE_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
+DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
+API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview")
+
+# Optional: an embedding deployment (e.g. text-embedding-3-small) that
+# powers the semantic cache. Leave unset to use exact-match caching only.
+EMBEDDING_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+
+# Validate that all required credentials are present
+# This prevents cryptic errors later if something is missing
+if not AZURE_ENDPOINT:
+    raise ValueError("AZURE_OPENAI_ENDPOINT not found in .env file")
+if not AZURE_API_KEY:
+    raise ValueError("AZURE_OPENAI_API_KEY not found in .env file")
+if not DEPLOYMENT_NAME:
+    raise ValueError("AZURE_OPENAI_DEPLOYMENT_NAME not found in .env file")
+
+
+# ============================================================================
+# AGENT INSTRUCTIONS - Defined once at module level, shared by every
+# advisor instance (a server can create many without rebuilding these)
+# ============================================================================
+
+_PROFILE_INSTRUCTIONS = """
+You gather information about the user's career goals and background.
+
+Extract 5 key items from the conversation:
+1. Career goal (cloud developer, data scientist, DevOps engineer, etc.)
+2. Current level (beginner/intermediate/advanced)
+3. Current skills (languages/tools they know)
+4. Time commitment (hours per week)
+5. Target timeline (3 months, 6 months, 1 year, etc.)
+
+Always reply with ONLY a JSON object in this exact shape:
+{"goal": ..., "level": ..., "skills": ..., "time": ..., "timeline": ...}
+
+Fill in every item the user has mentioned so far. Use null for any item
+the user has not provided yet. No other text, just the JSON object.
+"""
+
+# The roadmap layout, shared by the generic Advisor task and the
+# speculative draft (which has no researched resources yet)
+_ADVISOR_FORMAT = """
+Output format:
+
+**YOUR CAREER PATH: [Career Goal]**
+
+**PHASE 1: FOUNDATION (Months 1-2)**
+- [Resource 1]: [Why important - 10 words max]
+- [Resource 2]: [Why important - 10 words max]
+- Estimated time: [X hours]
+
+**PHASE 2: SKILL BUILDING (Months 3-4)**
+- [Resource 3]: [Why important - 10 words max]
+- [Resource 4]: [Why important - 10 words max]
+- Estimated time: [X hours]
+
+**PHASE 3: SPECIALIZATION (Months 5-6)**
+- [Resource 5]: [Why important - 10 words max]
+- [Resource 6]: [Why important - 10 words max]
+- Estimated time: [X hours]
+
+**CERTIFICATION TARGET**
+- [Certification name]: [Why valuable - 15 words max]
+- Exam link: [url]
+
+**WEEKLY COMMITMENT**
+Based on [X] hours/week: [Realistic timeline assessment]
+
+**NEXT STEPS**
+1. [Immediate action - 12 words max]
+2. [First resource to start - 12 words max]
+3. [How to track progress - 12 words max]
+
+RULES:
+- Adapt phase durations to user's timeline
+- Be realistic about time commitments
+- Always include certification goal
+- Keep each point under word limits
+- No fluff, just actionable advice
+"""
+
+
+# ============================================================================
+# SPECIALIZED ADVISOR TEMPLATES - Shorter task suffixes for common profiles
+# ============================================================================
+# The generic Advisor task covers every career and level, which costs
+# prompt tokens explaining cases that don't apply. For the goals and
+# levels we see most, a pre-baked template says only what matters:
+# shorter prompt, faster first token, sharper output. Each template is
+# a complete task suffix (it replaces _ADVISOR_TASK, riding on the same
+# shared prefix). Keys are the normalized (goal, level) from the parsed
+# profile; anything else falls back to the generic task.
+
+_ADVISOR_TEMPLATES: Dict[tuple, str] = {
+    ("cloud_developer", "beginner"): """TASK:
+Create a learning roadmap for a beginner aiming to become an Azure cloud
+developer. Resources below are pre-sorted into phases - keep them there
+and write one short rationale per resource.
+
+Structure: **YOUR CAREER PATH**, **PHASE 1-3** (each with resources and
+estimated hours), **CERTIFICATION TARGET** (target AZ-900 first, then
+AZ-204), **WEEKLY COMMITMENT**, **NEXT STEPS** (3 items).
+Start from zero: assume no cloud experience. Emphasize Azure
+fundamentals, one language (C# or Python), and free sandbox practice.
+No fluff, keep every point under 12 words.
+
+BUCKETED RESOURCES:
+""",
+    ("data_scientist", "beginner"): """TASK:
+Create a learning roadmap for a beginner aiming to become a data
+scientist. Resources below are pre-sorted into phases - keep them there
+and write one short rationale per resource.
+
+Structure: **YOUR CAREER PATH**, **PHASE 1-3** (each with resources and
+estimated hours), **CERTIFICATION TARGET** (target DP-100), **WEEKLY
+COMMITMENT**, **NEXT STEPS** (3 items).
+Start from zero: Python and statistics first, then ML on Azure.
+Emphasize notebooks and hands-on datasets over theory.
+No fluff, keep every point under 12 words.
+
+BUCKETED RESOURCES:
+""",
+    ("devops_engineer", "intermediate"): """TASK:
+Create a learning roadmap for an intermediate engineer moving into
+DevOps. Resources below are pre-sorted into phases - keep them there
+and write one short rationale per resource.
+
+Structure: **YOUR CAREER PATH**, **PHASE 1-3** (each with resources and
+estimated hours), **CERTIFICATION TARGET** (target AZ-400), **WEEKLY
+COMMITMENT**, **NEXT STEPS** (3 items).
+Build on existing dev skills: CI/CD pipelines, IaC, monitoring.
+Skip programming basics entirely.
+No fluff, keep every point under 12 words.
+
+BUCKETED RESOURCES:
+""",
+}
+
+
+def _advisor_template_key(fields: Dict[str, str]) -> tuple:
+    """Normalize parsed profile fields into a template lookup key."""
+    return (fields["goal"].replace(" ", "_"), fields["level"])
+
+
+# ============================================================================
+# SHARED CLIENT - One Azure OpenAI client for the whole process
+# ============================================================================
+
+@functools.cache
+def _get_chat_client() -> AzureOpenAIChatClient:
+    """
+    Create (once) and return the shared Azure OpenAI client.
+
+    functools.cache makes this a singleton: every CareerPathAdvisor in
+    the process reuses the same client, so the underlying HTTP session
+    and connection pool are shared instead of rebuilt per session.
+    """
+    return AzureOpenAIChatClient(
+        deployment_name=DEPLOYMENT_NAME,  # Which model to use
+        endpoint=AZURE_ENDPOINT,          # Where to send requests
+        api_key=AZURE_API_KEY,           # Authentication
+        api_version=API_VERSION          # API version
+    )
+
+
+# Whether the shared client's HTTPS connection has been warmed yet.
+# The client above is one per process, so one warmup ping per process
+# is enough - the flag stops every new advisor from re-paying a billed
+# LLM call that warms nothing.
+_azure_warmed = False
+
+
+# ============================================================================
+# SHARED PROMPT PREFIX - Identical leading bytes for Research + Advisor
+# ============================================================================
+# Provider prefix/KV caching matches prompts from token 0, so the
+# Research and Advisor agents use the SAME system instructions
+# (_SHARED_HEADER) and the same leading user content (profile block);
+# everything task-specific lives in the suffix appended at the end.
+# Keeping the shared portion byte-identical (no timestamps, no
+# reordered dicts) is what lets the server reuse its KV cache: lower
+# time-to-first-token and fewer billed prompt tokens.
+
+_SHARED_HEADER = "You are helping plan a personalized tech career learning path."
+
+_RESEARCH_TASK = """TASK:
+Search Microsoft Learn for learning resources matching the career goal above.
+
+Find 5-7 resources total, covering different skill levels: foundational
+courses, intermediate modules, advanced topics, at least one certification
+path, and hands-on labs when available.
+
+Reply with ONLY a JSON object in this exact shape:
+{"resources": [{"title": ..., "type": "course/module/certification/lab",
+"level": "beginner/intermediate/advanced", "duration": ..., "url": ...}]}
+
+No other text, just the JSON object.
+"""
+
+_ADVISOR_TASK = f"""TASK:
+Create a personalized learning roadmap with realistic timelines. The
+resources below are already sorted into phases: do NOT re-order, move,
+or add resources - just write one short rationale per listed resource.
+{_ADVISOR_FORMAT}
+BUCKETED RESOURCES:
+"""
+
+
+def _shared_prefix(profile: str) -> str:
+    """
+    Build the stable prompt prefix shared by Research and Advisor calls.
+
+    Same profile in, same bytes out - that's what makes server-side
+    prefix caching possible.
+    """
+    return f"PROFILE:\n{profile}\n---\n"
+
+
+# ============================================================================
+# CACHING MCP TOOL - Remember Microsoft Learn search results across sessions
+# ============================================================================
+
+class CachingMCPTool(MCPStreamableHTTPTool):
+    """
+    MCPStreamableHTTPTool with an on-disk cache in front of it.
+
+    Many users map to the same handful of searches ("cloud developer
+    beginner", "data scientist certification", ...), so tool calls
+    repeat constantly across sessions. On a hit the network round-trip
+    to Microsoft Learn vanishes - the Research Agent still runs, but its
+    tool returns instantly.
+    """
+
+    async def call_tool(self, tool_name: str, arguments=None, **kwargs):
+        """Check the cache before actually calling Microsoft Learn."""
+        # Stable key: tool name + canonically serialized arguments
+        digest = hashlib.blake2b(
+            (tool_name + json.dumps(arguments, sort_keys=True, default=str)).encode(),
+            digest_size=16,
+        ).hexdigest()
+        key = ("mcp", digest)
+
+        cache = _get_response_cache()
+        _admission.record(key)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        result = await super().call_tool(tool_name, arguments=arguments, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        # Only store recurring, expensive searches (admission policy).
+        # Docs are stable, so keep results for a week. Some result
+        # objects may not pickle - skip those rather than fail the call.
+        if _admission.admit(key, elapsed):
+            try:
+                cache.set(key, result, expire=MCP_CACHE_TTL)
+            except Exception:
+                pass
+        return result
+
+
+# ============================================================================
+# SPECULATIVE ROADMAP - Run the Advisor in parallel with Research
+# ============================================================================
+
+# Task suffix for asking the Advisor for a roadmap *before* the
+# Research Agent has returned. Rides on the same shared prefix as the
+# concurrent Research call, so even the speculative prompt reuses the
+# cached profile tokens. The Advisor falls back on its general
+# knowledge of Microsoft Learn instead of the researched resource list.
+SPECULATIVE_TASK = f"""TASK:
+No researched resource list is available yet. Draft the roadmap now using
+well-known Microsoft Learn courses, certifications, and labs that fit this
+profile. Use the exact official titles of the resources you pick.
+{_ADVISOR_FORMAT}"""
+
+# If at least this fraction of researched resource titles already appear
+# in the speculative roadmap, the speculation is good enough to keep
+SPECULATION_ACCEPT_THRESHOLD = 0.6
+
+
+# ============================================================================
+# RESPONSE CACHE HELPERS - Skip repeated LLM calls for repeated profiles
+# ============================================================================
+
+# Where cached agent responses live on disk (survives restarts)
+CACHE_DIR = ".career_cache"
+
+# How long cached Microsoft Learn search results stay valid. The docs
+# change slowly, so a week-old answer is still a good answer.
+MCP_CACHE_TTL = 7 * 24 * 3600  # 7 days, in seconds
+
+# Cache admission policy: a result is only worth storing if producing it
+# was slow AND the same request keeps coming back. One-off profiles and
+# cheap calls would just pollute the cache.
+CACHE_ADMIT_MIN_LATENCY = 0.5   # Seconds the call must have taken
+CACHE_ADMIT_MIN_SEEN = 2        # Times the key must appear before caching
+CACHE_ADMIT_SEEN_TTL = 30 * 24 * 3600  # Forget keys not seen for a month
+
+# Two profiles whose embeddings have cosine similarity above this are
+# treated as "the same" by the semantic cache. 0.92 is strict enough to
+# avoid mixing up different careers but catches rephrasings like
+# "Azure cloud dev" vs "cloud developer on Azure".
+SEMANTIC_SIMILARITY_THRESHOLD = 0.92
+
+# Cache key under which the semantic index (embeddings + responses) lives
+_SEMANTIC_INDEX_KEY = ("semantic", "research")
+
+# Timeouts and retries around agent calls. Without these, one hung
+# Azure call or MCP stall blocks the session forever (until Ctrl+C).
+AGENT_TIMEOUT = 60.0        # Max seconds to wait for any single agent call
+AGENT_RETRY_ATTEMPTS = 2    # Total attempts per call (1 retry)
+RETRY_BACKOFF_BASE = 1.0    # First retry waits ~this many seconds
+RETRY_BACKOFF_MAX = 10.0    # Backoff never grows past this
+HEDGE_AFTER = 20.0          # Research: fire a second attempt after this long
+
+# Errors worth retrying: timeouts, dropped connections, rate limits and
+# server-side hiccups. Anything else (bad request, bad auth) would just
+# fail again identically, so it's re-raised immediately instead.
+_TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    APIConnectionError,
+    APITimeoutError,
+    RateLimitError,
+    InternalServerError,
+)
+
+# Bounds on the profile conversation history we resend each turn.
+# Without a cap the prompt grows with every exchange - and LLM cost
+# grows faster than linearly with prompt length.
+PROFILE_CONTEXT_MAX_TURNS = 10
+# ~1500 tokens at the usual ~4 characters per token
+PROFILE_CONTEXT_CHAR_BUDGET = 6000
+
+# The 5 profile fields, in the order they appear in the profile block
+PROFILE_FIELDS = ("goal", "level", "skills", "time", "timeline")
+
+# One human-friendly question per field, used when we need to ask the
+# user for everything that's still missing - in a single message
+PROFILE_QUESTIONS = {
+    "goal": "What tech career are you interested in?",
+    "level": "What's your current experience level? (beginner/intermediate/advanced)",
+    "skills": "What programming languages or tools do you already know?",
+    "time": "How many hours per week can you dedicate to learning?",
+    "timeline": "What's your target timeline? (3 months, 6 months, 1 year)",
+}
+
+
+def _parse_resources(text: str) -> list:
+    """
+    Parse the Research Agent's JSON reply into a list of resource dicts.
+
+    Expects {"resources": [...]} but tolerates a bare list. Returns an
+    empty list if the reply isn't valid JSON, and drops any list entry
+    that isn't a dict - everything downstream calls .get() on them.
+    """
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    if isinstance(data, dict):
+        data = data.get("resources", [])
+    if not isinstance(data, list):
+        return []
+    return [entry for entry in data if isinstance(entry, dict)]
+
+
+def _bucket_resources(resources: list) -> Dict[str, list]:
+    """
+    Sort resources into roadmap phases by level - in Python, not the LLM.
+
+    Bucketing is deterministic (beginner -> Phase 1, intermediate ->
+    Phase 2, advanced -> Phase 3, certifications on the side), so paying
+    the Advisor to do it wastes generation tokens. Vectorized masks keep
+    it one comparison per bucket; the Advisor just writes rationales.
+    """
+    # An empty list (e.g. the Research reply didn't parse) would make
+    # the string comparisons below ill-defined - short-circuit it
+    if not resources:
+        return {
+            "phase_1_foundation": [],
+            "phase_2_skill_building": [],
+            "phase_3_specialization": [],
+            "certifications": [],
+        }
+
+    arr = np.array(resources, dtype=object)
+    levels = np.array([str(r.get("level", "")).lower() for r in resources])
+    types = np.array([str(r.get("type", "")).lower() for r in resources])
+
+    is_cert = types == "certification"
+    beginner = (levels == "beginner") & ~is_cert
+    advanced = (levels == "advanced") & ~is_cert
+    # Anything that's neither beginner, advanced, nor a certification
+    # (including unlabeled entries) lands in the middle phase
+    middle = ~beginner & ~advanced & ~is_cert
+
+    return {
+        "phase_1_foundation": list(arr[beginner]),
+        "phase_2_skill_building": list(arr[middle]),
+        "phase_3_specialization": list(arr[advanced]),
+        "certifications": list(arr[is_cert]),
+    }
+
+
+def _format_resources(resources: list) -> str:
+    """Render the resource list as readable lines for the terminal."""
+    lines = []
+    for r in resources:
+        lines.append(f"- {r.get('title', '?')} "
+                     f"[{r.get('type', '?')}, {r.get('level', '?')}, "
+                     f"{r.get('duration', '?')}]")
+        if r.get("url"):
+            lines.append(f"  {r['url']}")
+    return "\n".join(lines)
+
+
+async def _ainput(prompt: str) -> str:
+    """
+    Async-friendly version of the input() builtin.
+
+    input() blocks the whole event loop while the user types, which
+    freezes any background work (like warming up the Microsoft Learn
+    connection). Running it in a thread keeps the loop free.
+    """
+    return await asyncio.to_thread(input, prompt)
+
+
+def _format_profile_block(data: Dict[str, Any]) -> str:
+    """
+    Render a completed profile dict as the PROFILE_COMPLETE block.
+
+    The Research and Advisor agents (and the cache key builder) all
+    consume this text format, so we produce it here instead of asking
+    the LLM to format it.
+    """
+    return (
+        "PROFILE_COMPLETE\n"
+        f"- Goal: {data['goal']}\n"
+        f"- Level: {data['level']}\n"
+        f"- Skills: {data['skills']}\n"
+        f"- Time: {data['time']}\n"
+        f"- Timeline: {data['timeline']}"
+    )
+
+
+# One precompiled regex that both detects a completed profile and
+# captures all 5 fields in a single pass - compiled once at import, so
+# no per-turn pattern compilation and no second parsing pass later
+_PROFILE_RE = re.compile(
+    r"PROFILE_COMPLETE"
+    r".*?Goal:\s*(?P<goal>.+?)\n"
+    r".*?Level:\s*(?P<level>.+?)\n"
+    r".*?Skills:\s*(?P<skills>.+?)\n"
+    r".*?Time:\s*(?P<time>.+?)\n"
+    r".*?Timeline:\s*(?P<timeline>.+?)(?:\n|$)",
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+class _CacheAdmission:
+    """
+    Decide which results deserve a cache slot.
+
+    Tracks how often each key has been requested and admits an entry
+    only when the key is recurring and the call it would save is
+    expensive. The counts live in the same persistent diskcache as the
+    entries they gate - the CLI runs one session per process, so
+    in-memory counts would reset every run and the "seen at least
+    twice" bar could never be cleared. Stale keys expire after a month.
+    """
+
+    def record(self, key) -> None:
+        """Count one request for this key (persists across runs)."""
+        cache = _get_response_cache()
+        seen_key = ("seen",) + key
+        cache.incr(seen_key, default=0)
+        # Refresh the TTL so a recurring key never ages out mid-streak
+        cache.touch(seen_key, expire=CACHE_ADMIT_SEEN_TTL)
+
+    def admit(self, key, latency_saved: float) -> bool:
+        """Is this (key, cost) pair worth a cache slot?"""
+        if latency_saved < CACHE_ADMIT_MIN_LATENCY:
+            return False
+        count = _get_response_cache().get(("seen",) + key, 0)
+        return count >= CACHE_ADMIT_MIN_SEEN
+
+
+# One process-wide admission filter shared by every cache writer
+_admission = _CacheAdmission()
+
+
+@functools.cache
+def _get_response_cache() -> diskcache.Cache:
+    """
+    Open (once) the shared on-disk cache.
+
+    Everything cacheable - agent responses, semantic index, MCP search
+    results - lives in this one cache so a single directory holds all
+    persisted state.
+    """
+    return diskcache.Cache(CACHE_DIR)
+
+
+def _parse_profile_fields(profile_text: str) -> Optional[Dict[str, str]]:
+    """
+    Pull the 5 profile fields out of a PROFILE_COMPLETE block.
+
+    The Profile Agent emits lines like "- Goal: cloud developer".
+    One match against _PROFILE_RE extracts everything; values are
+    normalized (lowercase, stripped) so two users who answer the same
+    way produce the same dict.
+
+    Returns None if the block is missing or incomplete.
+    """
+    match = _PROFILE_RE.search(profile_text)
+    if not match:
+        return None
+    return {name: value.strip().lower()
+            for name, value in match.groupdict().items()}
+
+
+def _profile_cache_key(fields: Dict[str, str]) -> str:
+    """
+    Turn normalized profile fields into a short, stable cache key.
+
+    json.dumps with sort_keys=True guarantees the same fields always
+    serialize to the same string, and blake2b hashes it down to a
+    fixed-size key.
+    """
+    canonical = json.dumps(fields, sort_keys=True)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+# ============================================================================
+# STRUCTURED LOGGING - One JSON event per phase instead of bare prints
+# ============================================================================
+# Each event carries its phase and latency in milliseconds, so a log
+# scrape can answer "which phase dominates?" across many sessions -
+# something the old print statements could never do.
+
+structlog.configure(
+    processors=[
+        structlog.processors.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.JSONRenderer(
+            # orjson returns bytes; structlog wants str
+            serializer=lambda obj, **kwargs: orjson.dumps(obj).decode()
+        ),
+    ],
+    # Events go to stderr: stdout belongs to the conversation and the
+    # streamed roadmap, and this keeps `2> metrics.log` working
+    logger_factory=structlog.PrintLoggerFactory(file=sys.stderr),
+)
+
+logger = structlog.get_logger()
+
+
+# ============================================================================
+# SESSION RESULT - What one advising session produces
+# ============================================================================
+
+# Where finished sessions are written so users can revisit their roadmap
+SESSIONS_DIR = Path("sessions")
+
+
+@dataclass(slots=True)
+class SessionResult:
+    """
+    The three artifacts of one session, in the order they're produced.
+
+    slots=True keeps instances small, and a dataclass (unlike the old
+    plain dict) documents exactly what a session contains.
+    """
+    user_profile: str = ""
+    learning_resources: list = field(default_factory=list)
+    career_roadmap: str = ""
+
+
+# ============================================================================
+# MAIN CLASS - The Career Path Advisor System
+# ============================================================================
+
+class CareerPathAdvisor:
+    """
+    Main class that orchestrates the 3-agent system.
+    
+    Think of this as the "manager" that coordinates:
+    - Profile Agent (asks questions)
+    - Research Agent (searches Microsoft Learn)
+    - Advisor Agent (creates roadmap)
+    """
+    
+    def __init__(self, interactive: bool = True):
+        """
+        Initialize the advisor system.
+        Sets up the AI client, Microsoft Learn connection, and 3 agents.
+
+        Args:
+            interactive: True (the CLI default) prints resource listings
+                and streams the roadmap to the terminal as it's written.
+                Pass False for server use (the HTTP API), where several
+                sessions share one process and stdout output from each
+                would interleave into garbage.
+        """
+        self._interactive = interactive
+
+
+        # ===== STEP 1: Get the shared Azure OpenAI client =====
+        # This is how we communicate with GPT-4o. The client is a
+        # process-wide singleton so its HTTP connection pool is reused
+        # across advisor instances.
+        self.chat_client = _get_chat_client()
+        
+        # ===== STEP 2: Create Microsoft Learn MCP tool =====
+        # MCP = Model Context Protocol
+        # This lets our agents search Microsoft Learn documentation
+        # (with repeated searches answered from the on-disk cache)
+        self.mslearn_mcp = CachingMCPTool(
+            name="microsoft_learn",
+            url="https://learn.microsoft.com/api/mcp",
+            timeout=30,           # Wait max 30 seconds for response
+            request_timeout=30,   # Same timeout for requests
+        )
+        
+        # ===== STEP 3: Create the 3 specialized agents =====
+        self.profile_agent = self._create_profile_agent()
+        self.research_agent = self._create_research_agent()
+        self.advisor_agent = self._create_advisor_agent()
+        
+        # ===== STEP 4: Open the response cache =====
+        # Repeated profiles (same goal/level/skills/time/timeline) return
+        # cached results instantly instead of paying for LLM calls again
+        self._cache = _get_response_cache()
+
+        # Semantic cache: embeddings of past profiles plus the research
+        # results they produced. Only active when an embedding deployment
+        # is configured; otherwise we fall back to exact-match caching.
+        self._embedding_client = None
+        if EMBEDDING_DEPLOYMENT:
+            self._embedding_client = AsyncAzureOpenAI(
+                azure_endpoint=AZURE_ENDPOINT,
+                api_key=AZURE_API_KEY,
+                api_version=API_VERSION,
+            )
+        # List of (embedding vector, resource list) pairs, loaded from
+        # disk so hits survive restarts
+        self._semantic_index = self._cache.get(_SEMANTIC_INDEX_KEY, [])
+
+        # ===== STEP 6: Start warming up connections =====
+        # The Microsoft Learn handshake and the first Azure OpenAI call
+        # both pay one-time setup costs (DNS, TLS). Kick them off right
+        # away so they overlap with the user typing instead of landing
+        # on the first real agent call. Outside a running event loop
+        # (plain constructor call), __aenter__ starts the warmup instead.
+        self._warmup_task = None
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            self._warmup_task = asyncio.ensure_future(self._warmup_connections())
+
+        # ===== STEP 5: Initialize conversation context =====
+        # Stores the conversation history to avoid repeating questions.
+        # A bounded deque (plus a char budget, enforced on append) keeps
+        # the prompt we resend each turn from growing without limit.
+        self._profile_context = deque(maxlen=PROFILE_CONTEXT_MAX_TURNS)
+        # The joined history, maintained incrementally so we don't
+        # rebuild the whole string on every turn
+        self._profile_context_str = ""
+        
+        # Storage for the final outputs of each agent, persisted to
+        # disk in one shot when the session finishes
+        self.session = SessionResult()
+    
+    
+    # ========================================================================
+    # AGENT 1: PROFILE AGENT
+    # Purpose: Understand the user's career goals and background
+    # ========================================================================
+    
+    def _create_profile_agent(self) -> ChatAgent:
+        """
+        Creates the Profile Agent with specific instructions.
+        
+        This agent asks questions to understand:
+        - What career you want
+        - Your current skill level
+        - What you already know
+        - How much time you have
+        - Your target timeline
+        """
+        return ChatAgent(
+            chat_client=self.chat_client,
+            name="ProfileAgent",
+
+            # Instructions tell the AI how to behave
+            # This is called "prompt engineering" - see the module-level
+            # constant for the actual prompt text
+            instructions=_PROFILE_INSTRUCTIONS,
+
+            # Constrain the model to valid JSON output - fewer wasted
+            # tokens and no free-form text to parse
+            response_format={"type": "json_object"},
+        )
+    
+    
+    # ========================================================================
+    # AGENT 2: RESEARCH AGENT
+    # Purpose: Search Microsoft Learn for relevant courses and certifications
+    # ========================================================================
+    
+    def _create_research_agent(self) -> ChatAgent:
+        """
+        Creates the Research Agent with Microsoft Learn search capability.
+        
+        This agent:
+        - Searches Microsoft Learn documentation
+        - Finds courses, certifications, labs
+        - Returns structured data about each resource
+        """
+        return ChatAgent(
+            chat_client=self.chat_client,
+            name="ResearchAgent",
+            
+            # Identical to the Advisor's instructions so both prompts
+            # share the same leading bytes (see the shared-prefix notes)
+            instructions=_SHARED_HEADER,
+
+            # Constrain the model to valid JSON, like the Profile Agent:
+            # fewer output tokens than the old labeled-text format and
+            # nothing brittle to parse
+            response_format={"type": "json_object"},
+
+            # IMPORTANT: This agent gets the MCP tool to search Microsoft Learn
+            tools=[self.mslearn_mcp],
+        )
+    
+    
+    # ========================================================================
+    # AGENT 3: ADVISOR AGENT
+    # Purpose: Create a personalized learning roadmap
+    # ========================================================================
+    
+    def _create_advisor_agent(self) -> ChatAgent:
+        """
+        Creates the Advisor Agent that builds the final roadmap.
+        
+        This agent:
+        - Takes the user profile (from Agent 1)
+        - Takes the learning resources (from Agent 2)
+        - Creates a phased learning plan with realistic timelines
+        """
+        return ChatAgent(
+            chat_client=self.chat_client,
+            name="AdvisorAgent",
+            
+            # Identical to the Research Agent's instructions; the
+            # roadmap format directives travel in the task suffix
+            instructions=_SHARED_HEADER,
+        )
+    
+    
+    # ========================================================================
+    # WORKFLOW METHODS - How the agents work together
+    # ========================================================================
+    
+    async def _embed_profile(self, profile: str) -> Optional[np.ndarray]:
+        """
+        Embed a profile as a unit-length vector for similarity search.
+
+        Returns None when no embedding deployment is configured or the
+        call fails - the caches then simply skip the semantic tier.
+        """
+        if self._embedding_client is None:
+            return None
+        try:
+            result = await self._embedding_client.embeddings.create(
+                model=EMBEDDING_DEPLOYMENT,
+                input=profile,
+            )
+        except Exception:
+            # Embeddings are an optimization; never let them break the flow
+            return None
+        vector = np.asarray(result.data[0].embedding, dtype=np.float32)
+        # Normalize so a plain dot product equals cosine similarity
+        return vector / np.linalg.norm(vector)
+
+    def _semantic_lookup(self, vector: np.ndarray) -> Optional[list]:
+        """
+        Find cached research results for a profile *similar* to this one.
+
+        Scans the stored embeddings with one dot product (the index is
+        tiny, so a numpy scan beats carrying a vector-database
+        dependency). Returns the cached resources on a hit, else None.
+        """
+        if not self._semantic_index:
+            return None
+        matrix = np.stack([vec for vec, _ in self._semantic_index])
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] > SEMANTIC_SIMILARITY_THRESHOLD:
+            return self._semantic_index[best][1]
+        return None
+
+    def _semantic_store(self, vector: np.ndarray, resources: list) -> None:
+        """Add a profile embedding + its research results to the index."""
+        self._semantic_index.append((vector, resources))
+        self._cache.set(_SEMANTIC_INDEX_KEY, self._semantic_index)
+
+    async def _run_with_retry(self, make_coro, timeout: float = AGENT_TIMEOUT,
+                              attempts: int = AGENT_RETRY_ATTEMPTS):
+        """
+        Run an agent call with a timeout and exponential-backoff retry.
+
+        Args:
+            make_coro: Zero-argument callable returning a fresh coroutine
+                (a coroutine can only be awaited once, so we need a
+                factory to retry)
+            timeout: Max seconds per attempt
+            attempts: Total attempts before giving up
+
+        Returns:
+            Whatever the coroutine returns
+
+        Raises:
+            The last transient error if every attempt fails; a
+            non-transient error (bad request, bad auth) right away
+        """
+        for attempt in range(attempts):
+            try:
+                return await asyncio.wait_for(make_coro(), timeout)
+            except _TRANSIENT_ERRORS:
+                if attempt == attempts - 1:
+                    raise
+                # Wait a bit before retrying: 1s, 2s, 4s... plus jitter
+                # so concurrent sessions don't all retry in lockstep
+                delay = min(RETRY_BACKOFF_MAX,
+                            RETRY_BACKOFF_BASE * (2 ** attempt))
+                await asyncio.sleep(delay + random.uniform(0, 1))
+
+    async def _run_hedged(self, make_coro, timeout: float = AGENT_TIMEOUT,
+                          hedge_after: float = HEDGE_AFTER):
+        """
+        Run a call, and if it's slow, race a duplicate against it.
+
+        Most calls finish quickly; the occasional straggler (a slow MCP
+        search) gets a second concurrent attempt after `hedge_after`
+        seconds, and whichever *succeeds* first wins. This trims the
+        slowest-case latency without costing anything on fast calls.
+
+        Each hedged round also gets the same transient-error retry as
+        every other agent call, so one dropped connection or rate limit
+        doesn't abort the session.
+        """
+        return await self._run_with_retry(
+            lambda: self._hedge_once(make_coro, timeout, hedge_after),
+            timeout=timeout,
+        )
+
+    async def _hedge_once(self, make_coro, timeout: float,
+                          hedge_after: float):
+        """One hedged round: the primary attempt, plus a duplicate if slow."""
+        first = asyncio.create_task(make_coro())
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        # First attempt is dragging - fire the hedge and race the two.
+        # A failed attempt must not take its still-running twin down
+        # with it, so keep waiting on the survivor rather than grabbing
+        # whatever crossed the line first.
+        tasks = {first, asyncio.create_task(make_coro())}
+        # The hedge_after seconds already spent count against the
+        # overall budget, so the total wait never exceeds `timeout`
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout - hedge_after)
+        last_error = None
+        while tasks:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, tasks = await asyncio.wait(
+                tasks,
+                timeout=remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                try:
+                    result = task.result()
+                except Exception as error:
+                    last_error = error
+                else:
+                    for straggler in tasks:
+                        straggler.cancel()
+                    return result
+        for task in tasks:
+            task.cancel()
+        if last_error is not None:
+            raise last_error
+        raise asyncio.TimeoutError(
+            f"Agent call did not finish within {timeout} seconds"
+        )
+
+    async def _run_streaming(self, agent: ChatAgent, query: str) -> str:
+        """
+        Run an agent and stream its answer to the screen token by token.
+
+        Instead of waiting silently for the whole response, the user sees
+        text appear as soon as the model produces it - the wait "feels"
+        as short as the time to the first token.
+
+        Args:
+            agent: Which agent to run
+            query: The prompt to send it
+
+        Returns:
+            The complete response text (accumulated from the stream)
+        """
+        parts = []
+        async for chunk in agent.run_stream(query):
+            if chunk.text:
+                sys.stdout.write(chunk.text)
+                sys.stdout.flush()
+                parts.append(chunk.text)
+        print()  # Finish with a newline
+        return "".join(parts)
+
+    def _append_profile_context(self, line: str) -> None:
+        """
+        Add one conversation turn to the bounded history.
+
+        Normally the joined string grows by simple concatenation (O(1)
+        per turn); it's only rebuilt when the deque evicts its oldest
+        turn or the character budget forces older turns out.
+        """
+        evicting = len(self._profile_context) == self._profile_context.maxlen
+        self._profile_context.append(line)
+
+        if evicting:
+            # Oldest turn fell off the deque - rebuild once
+            self._profile_context_str = "\n".join(self._profile_context)
+        elif self._profile_context_str:
+            self._profile_context_str += "\n" + line
+        else:
+            self._profile_context_str = line
+
+        # Enforce the token budget (approximated in characters): drop
+        # oldest turns until we fit, always keeping the newest one
+        while (len(self._profile_context_str) > PROFILE_CONTEXT_CHAR_BUDGET
+               and len(self._profile_context) > 1):
+            self._profile_context.popleft()
+            self._profile_context_str = "\n".join(self._profile_context)
+
+    async def gather_profile(self, user_input: str) -> str:
+        """
+        Step 1: Use Profile Agent to gather user information.
+        
+        Args:
+            user_input: What the user typed
+            
+        Returns:
+            The agent's response (either a question or PROFILE_COMPLETE)
+        """
+        # Add user input to conversation history
+        # This helps the agent remember what was already asked
+        self._append_profile_context(f"User: {user_input}")
+
+        # Send the full conversation to the agent - ONE call extracts
+        # everything the user has said so far, instead of one call per field
+        t0 = time.perf_counter()
+        response = await self._run_with_retry(
+            lambda: self.profile_agent.run(self._profile_context_str)
+        )
+        logger.info("phase_done", phase=1, step="profile_turn",
+                    ms=round((time.perf_counter() - t0) * 1000, 1))
+
+        # Add agent's response to history
+        self._append_profile_context(f"Agent: {response.text}")
+
+        # The agent replies with JSON: filled-in fields plus null for
+        # anything the user hasn't mentioned yet
+        try:
+            data = json.loads(response.text)
+        except (json.JSONDecodeError, TypeError):
+            # Malformed reply - show it as-is and let the loop retry
+            return response.text
+
+        # Which fields are still empty?
+        missing = [f for f in PROFILE_FIELDS if not data.get(f)]
+
+        if not missing:
+            # Everything answered - render the standard profile block
+            return _format_profile_block(data)
+
+        # Ask for ALL missing fields in one message, instead of one
+        # question (and one LLM round-trip) per field
+        questions = "\n".join(f"- {PROFILE_QUESTIONS[f]}" for f in missing)
+        return f"Just a few more details:\n{questions}"
+    
+    async def research_learning_path(self, profile: str) -> list:
+        """
+        Step 2: Use Research Agent to find learning resources.
+
+        Args:
+            profile: The complete user profile from Agent 1
+
+        Returns:
+            List of resource dicts (title/type/level/duration/url)
+        """
+
+        # Check the cache first: if another session had the same profile,
+        # we already know which resources to recommend. The regex parse
+        # runs in a thread so concurrent sessions' I/O keeps flowing.
+        fields = await asyncio.to_thread(_parse_profile_fields, profile)
+        cache_key = ("research", _profile_cache_key(fields)) if fields else None
+        if cache_key is not None:
+            _admission.record(cache_key)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info("cache_hit", phase=2, tier="exact")
+                if self._interactive:
+                    print(f"\n{_format_resources(cached)}")
+                return cached
+
+        # No exact match - try the semantic tier: a previous profile that
+        # merely *phrases* the same goals differently still counts as a hit
+        vector = await self._embed_profile(profile)
+        if vector is not None:
+            # The similarity scan is pure CPU (numpy over the whole
+            # index) - run it in a thread so it can't stall the loop
+            # as the index grows
+            similar = await asyncio.to_thread(self._semantic_lookup, vector)
+            if similar is not None:
+                logger.info("cache_hit", phase=2, tier="semantic")
+                if self._interactive:
+                    print(f"\n{_format_resources(similar)}")
+                return similar
+
+        # Create a search query for the Research Agent: shared prefix
+        # first (prefix-cacheable), task directive last
+        research_query = _shared_prefix(profile) + _RESEARCH_TASK
+
+
+        # The Research Agent will use the MCP tool to search Microsoft
+        # Learn. The call is hedged: if it's unusually slow, a duplicate
+        # races it and the faster one wins. (Hedging is why this call is
+        # buffered rather than streamed - two concurrent streams would
+        # interleave on the terminal.)
+        started = time.perf_counter()
+        response = await self._run_hedged(
+            lambda: self.research_agent.run(research_query)
+        )
+        elapsed = time.perf_counter() - started
+        logger.info("phase_done", phase=2, step="research",
+                    ms=round(elapsed * 1000, 1))
+        resources = _parse_resources(response.text)
+        if self._interactive:
+            print(f"\n{_format_resources(resources)}")
+
+        # Remember the answer for the next session with this profile,
+        # both exactly (by field hash) and semantically (by embedding).
+        # An empty list means the reply didn't parse - don't cache that,
+        # and let the admission policy veto one-off or cheap results.
+        if not resources:
+            return resources
+        if cache_key is not None and _admission.admit(cache_key, elapsed):
+            self._cache.set(cache_key, resources)
+            if vector is not None:
+                self._semantic_store(vector, resources)
+
+        return resources
+    
+    async def create_roadmap(self, profile: str, resources: list) -> str:
+        """
+        Step 3: Use Advisor Agent to create personalized roadmap.
+        
+        Args:
+            profile: User profile from Agent 1
+            resources: Resource dicts from Agent 2
+            
+        Returns:
+            Personalized learning roadmap with phases and timelines
+        """
+        # Same idea as research_learning_path: identical profiles get
+        # identical roadmaps, so look it up before calling the LLM
+        fields = await asyncio.to_thread(_parse_profile_fields, profile)
+        cache_key = ("roadmap", _profile_cache_key(fields)) if fields else None
+        if cache_key is not None:
+            _admission.record(cache_key)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info("cache_hit", phase=3, tier="exact")
+                if self._interactive:
+                    print(f"\n{cached}")
+                return cached
+
+        # Combine profile and resources for the Advisor Agent: the prefix
+        # matches the Research call byte-for-byte, so the server can
+        # reuse its cached computation for those tokens
+        # Pre-bucket by level so the Advisor spends zero tokens deciding
+        # what goes in which phase, then send compact JSON. Common
+        # (goal, level) combinations swap in a shorter, tailored task
+        # suffix; everyone else gets the generic one.
+        task = _ADVISOR_TASK
+        if fields is not None:
+            template = _ADVISOR_TEMPLATES.get(_advisor_template_key(fields))
+            if template is not None:
+                logger.info("advisor_specialized",
+                            key=list(_advisor_template_key(fields)))
+                task = template
+        buckets = _bucket_resources(resources)
+        roadmap_query = (_shared_prefix(profile) + task
+                         + json.dumps(buckets, separators=(",", ":")))
+
+
+        # The Advisor Agent synthesizes everything into a roadmap (with
+        # timeout + retry). In the CLI it streams to the screen as it's
+        # written; in server mode it's buffered - nobody is watching the
+        # server's terminal, and concurrent sessions would interleave.
+        started = time.perf_counter()
+        if self._interactive:
+            print()
+            roadmap = await self._run_with_retry(
+                lambda: self._run_streaming(self.advisor_agent, roadmap_query)
+            )
+        else:
+            response = await self._run_with_retry(
+                lambda: self.advisor_agent.run(roadmap_query)
+            )
+            roadmap = response.text
+        elapsed = time.perf_counter() - started
+        logger.info("phase_done", phase=3, step="roadmap",
+                    ms=round(elapsed * 1000, 1))
+
+        # Cache the roadmap for future sessions with the same profile,
+        # if the admission policy agrees it's worth a slot
+        if cache_key is not None and _admission.admit(cache_key, elapsed):
+            self._cache.set(cache_key, roadmap)
+
+        return roadmap
+    
+    def _validate_speculation(self, resources: list, spec_roadmap: str) -> bool:
+        """
+        Decide whether a speculative roadmap is good enough to keep.
+
+        The Advisor drafted the roadmap without seeing the researched
+        resources, so we check how many of the researched titles it
+        guessed anyway. If most of them are already cited, the draft is
+        accepted and we skip the second Advisor call entirely.
+
+        Args:
+            resources: Resource dicts from the Research Agent
+            spec_roadmap: Roadmap drafted before research finished
+
+        Returns:
+            True if the speculative roadmap cites enough of the resources
+        """
+        titles = [r.get("title", "") for r in resources if r.get("title")]
+        if not titles:
+            return False
+
+        roadmap_lower = spec_roadmap.lower()
+        cited = sum(1 for title in titles if title.strip().lower() in roadmap_lower)
+        return cited / len(titles) >= SPECULATION_ACCEPT_THRESHOLD
+
+    async def _warmup_connections(self):
+        """
+        Open the Microsoft Learn MCP session and ping Azure OpenAI.
+
+        Both handshakes (DNS + TLS + MCP setup, and the chat client's
+        first HTTPS connection) take real wall-clock time. By starting
+        them while the user is still typing, the connections are already
+        warm when the first real agent call needs them.
+        """
+        try:
+            await self.mslearn_mcp.__aenter__()
+        except Exception:
+            # Warming is purely an optimization - if it fails, the
+            # Research Agent will just connect on first use as before
+            pass
+        global _azure_warmed
+        if not _azure_warmed:
+            # Flip the flag before awaiting so concurrent advisors
+            # (the API opens many at once) don't all ping together
+            _azure_warmed = True
+            try:
+                # A near-empty request capped to a single output token;
+                # its only job is to establish the HTTPS connection the
+                # real calls will reuse
+                await self.profile_agent.run("Reply with {} only.",
+                                             max_tokens=1)
+            except Exception:
+                pass
+
+    def _save_session(self) -> Path:
+        """
+        Write the finished session to sessions/<uuid>.json.
+
+        One write, at the end, with orjson (much faster than the stdlib
+        json module - not that it matters at this size, but it's the
+        same API for free).
+        """
+        SESSIONS_DIR.mkdir(exist_ok=True)
+        path = SESSIONS_DIR / f"{uuid4()}.json"
+        path.write_bytes(orjson.dumps(asdict(self.session)))
+        return path
+
+    # ========================================================================
+    # CONNECTION LIFECYCLE - One MCP session for the whole advisor
+    # ========================================================================
+
+    async def __aenter__(self) -> "CareerPathAdvisor":
+        """
+        Open the advisor: make sure the connection warmup is underway.
+
+        The warmup runs as a background task so the welcome prompt
+        appears immediately; the MCP session is established once, then
+        reused for every Research call instead of re-handshaking.
+        """
+        if self._warmup_task is None:
+            # Constructor ran outside an event loop - start warming now
+            self._warmup_task = asyncio.create_task(self._warmup_connections())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """
+        Close the advisor: shut down the MCP session cleanly.
+
+        Closing here (instead of ad-hoc cleanup at the end of the
+        session) prevents the annoying async cleanup errors you might
+        otherwise see on exit.
+        """
+        try:
+            # Make sure the warmup has finished before closing
+            if self._warmup_task is not None:
+                await self._warmup_task
+            await self.mslearn_mcp.__aexit__(exc_type, exc_val, exc_tb)
+        except Exception:
+            # If cleanup fails, that's okay - just ignore it
+            pass
+
+
+
+    # ========================================================================
+    # MAIN INTERACTIVE SESSION - Brings it all together
+    # ========================================================================
+    
+    async def run_interactive_session(self):
+        """
+        Main workflow that orchestrates all 3 agents.
+        
+        Flow:
+        1. Profile Agent asks questions → gathers user profile
+        2. Research Agent searches Microsoft Learn → finds resources
+        3. Advisor Agent creates roadmap → personalized learning path
+        """
+        
+        # ===== Welcome message =====
+        print("\n" + "="*70)
+        print("🎯 CAREER PATH ADVISOR - Powered by Microsoft Learn")
+        print("="*70)
+        print("\nLet's plan your tech career journey!\n")
+
+        session_start = time.perf_counter()
+
+        # ===== PHASE 1: Gather Profile =====
+        # Ask the initial question (without blocking the event loop)
+        user_input = await _ainput("What tech career are you interested in? ")
+        
+        profile_text = ""
+        # Allow up to 5 exchanges (question + answer pairs)
+        for i in range(5):
+            # Get response from Profile Agent
+            profile_response = await self.gather_profile(user_input)
+            print(f"\n{profile_response}")
+            
+            # Check if we have all the info we need (same compiled regex
+            # that the cache key builder uses to extract the fields)
+            if _PROFILE_RE.search(profile_response):
+                profile_text = profile_response
+                break
+            
+            # Ask for more input
+            user_input = await _ainput("\n> ")
+            if not user_input.strip():
+                break
+        
+        # Fallback: use last response if we didn't get PROFILE_COMPLETE
+        if not profile_text:
+            profile_text = profile_response
+        
+        # Store the profile
+        self.session.user_profile = profile_text
+        
+        # ===== PHASE 2 + 3: Research and a speculative roadmap, in parallel =====
+        # Instead of waiting for research before starting the roadmap,
+        # we let the Advisor draft one from the profile alone while the
+        # Research Agent searches Microsoft Learn. Total wait time becomes
+        # max(research, draft) instead of research + roadmap.
+        #
+        # But not when a cached roadmap already exists: then both phases
+        # answer from cache in milliseconds, and a speculative draft
+        # would only burn tokens, block the session on its generation,
+        # and shadow the cached roadmap.
+        fields = _parse_profile_fields(profile_text)
+        roadmap_cached = (
+            fields is not None
+            and self._cache.get(("roadmap", _profile_cache_key(fields)))
+                is not None
+        )
+
+        resources_task = asyncio.create_task(
+            self.research_learning_path(profile_text)
+        )
+        speculative_response = None
+        speculation_started = time.perf_counter()
+        if not roadmap_cached:
+            speculative_task = asyncio.create_task(
+                self._run_with_retry(
+                    lambda: self.advisor_agent.run(
+                        _shared_prefix(profile_text) + SPECULATIVE_TASK
+                    )
+                )
+            )
+            # return_exceptions: a failed draft must not kill a session
+            # whose research succeeded - speculation is an optimization
+            learning_resources, speculative_response = await asyncio.gather(
+                resources_task, speculative_task, return_exceptions=True
+            )
+            if isinstance(learning_resources, BaseException):
+                raise learning_resources
+            if isinstance(speculative_response, BaseException):
+                logger.info("speculation_failed",
+                            error=str(speculative_response))
+                speculative_response = None
+        else:
+            learning_resources = await resources_task
+        self.session.learning_resources = learning_resources
+
+        # If the draft already cites most of the researched resources,
+        # keep it. Otherwise (no draft, failed draft, or a poor one) do
+        # a proper roadmap pass with the resources, which streams to the
+        # screen as it's generated - or returns the cached roadmap.
+        if speculative_response is not None and self._validate_speculation(
+                learning_resources, speculative_response.text):
+            logger.info("speculation_accepted", phase=3)
+            career_roadmap = speculative_response.text
+            print(f"\n{career_roadmap}")
+            # An accepted draft *is* the roadmap for this profile, so
+            # store it under the same key create_roadmap uses. Without
+            # this, a profile whose drafts keep being accepted would
+            # never populate the roadmap cache and would pay for a
+            # fresh draft on every repeat session.
+            if fields is not None:
+                roadmap_key = ("roadmap", _profile_cache_key(fields))
+                _admission.record(roadmap_key)
+                spec_elapsed = time.perf_counter() - speculation_started
+                if _admission.admit(roadmap_key, spec_elapsed):
+                    self._cache.set(roadmap_key, career_roadmap)
+        else:
+            career_roadmap = await self.create_roadmap(profile_text, learning_resources)
+        self.session.career_roadmap = career_roadmap
+        
+        # ===== Success message =====
+        print("\n" + "="*70)
+        print("✅ YOUR PERSONALIZED LEARNING PATH IS READY!")
+        print("="*70)
+        print("\n💡 Tip: Bookmark the resource links and start with Phase 1!")
+
+        logger.info("session_done",
+                    ms=round((time.perf_counter() - session_start) * 1000, 1))
+
+        # Persist everything in a single atomic write at the very end -
+        # one orjson.dumps instead of incremental serialization
+        saved_to = self._save_session()
+        print(f"📄 Saved to: {saved_to}")
+
+
+# ============================================================================
+# PROGRAM ENTRY POINT
+# ============================================================================
+
+async def main():
+    """
+    Main function that runs the career advisor.
+    
+    This is the entry point when you run: python career_path_advisor.py
+    """
+    try:
+        # Create the advisor system; the async with block opens the
+        # Microsoft Learn connection once and closes it when we're done
+        async with CareerPathAdvisor() as advisor:
+            # Run the interactive session
+            await advisor.run_interactive_session()
+
+
+    except KeyboardInterrupt:
+        # Handle Ctrl+C gracefully
+        print("\n\n👋 Good luck on your learning journey!")
+    except Exception as e:
+        # Handle any other errors
+        print(f"\n❌ Error: {e}")
+
+
+# This ensures main() only runs when executing this file directly
+# (not when importing it as a module)
+if __name__ == "__main__":
+    # Swap in uvloop's faster event loop when it's available - a free
+    # speedup for the streaming HTTP work the MCP tool does. Must happen
+    # before asyncio.run() creates the loop.
+    if uvloop is not None:
+        uvloop.install()
+
+    # asyncio.run() is how we run async functions in Python
+    asyncio.run(main())
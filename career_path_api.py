@@ -0,0 +1,193 @@
+"""
+career_path_api.py
+HTTP API for the Career Path Advisor
+
+The CLI in career_path_advisor.py serves one user per process. This
+wrapper serves many users from a single process: every session shares
+one event loop, one Azure OpenAI client (and its connection pool), and
+one warm Microsoft Learn connection per advisor, so the expensive setup
+cost is paid once instead of per user.
+
+Run it with:
+    uvicorn career_path_api:app --loop uvloop
+
+Endpoints:
+- POST /turn    One conversation turn: send user input, get back either
+                the next profile question or the finished roadmap
+- POST /advise  One-shot: send a complete profile, get back resources
+                and roadmap in a single response
+"""
+
+import time
+import asyncio
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from career_path_advisor import (
+    CareerPathAdvisor,
+    _format_profile_block,
+    _PROFILE_RE,
+)
+
+
+app = FastAPI(title="Career Path Advisor")
+
+# Sessions idle longer than this are evicted (their MCP connection
+# closed), so abandoned conversations can't leak advisors forever
+SESSION_TTL = 30 * 60  # seconds
+
+# Hard cap on tracked sessions; the oldest is evicted to make room
+MAX_SESSIONS = 100
+
+# Same safety cap as the CLI's profile loop: after this many turns we
+# stop asking questions and proceed with whatever profile we have
+MAX_PROFILE_TURNS = 5
+
+# One entry per active session, keyed by the caller's session id:
+# {"advisor": CareerPathAdvisor, "last_used": float, "turns": int}.
+# The lock guards the dict itself - individual advisors are only ever
+# touched by their own session's requests.
+_sessions: dict = {}
+_sessions_lock = asyncio.Lock()
+
+
+# ============================================================================
+# REQUEST / RESPONSE MODELS
+# ============================================================================
+
+class TurnRequest(BaseModel):
+    """One turn of the profile conversation."""
+    session_id: str
+    user_input: str
+
+
+class TurnResponse(BaseModel):
+    """What the advisor says back - a question, or the final roadmap."""
+    done: bool
+    message: str
+    resources: list = []
+    roadmap: str = ""
+
+
+class AdviseRequest(BaseModel):
+    """A complete profile, submitted in one go."""
+    goal: str
+    level: str
+    skills: str
+    time: str
+    timeline: str
+
+
+class AdviseResponse(BaseModel):
+    """Resources plus roadmap for a complete profile."""
+    resources: list
+    roadmap: str
+
+
+# ============================================================================
+# SESSION MANAGEMENT
+# ============================================================================
+
+def _pop_evictable(keep_id: str) -> list:
+    """
+    Remove expired sessions (and the oldest ones over the size cap)
+    from the store. Must be called with the lock held; returns the
+    evicted advisors so the caller can close them outside the lock.
+    """
+    now = time.monotonic()
+    evicted = []
+    for sid in [s for s, e in _sessions.items()
+                if now - e["last_used"] > SESSION_TTL and s != keep_id]:
+        evicted.append(_sessions.pop(sid)["advisor"])
+    while len(_sessions) >= MAX_SESSIONS:
+        oldest = min((s for s in _sessions if s != keep_id),
+                     key=lambda s: _sessions[s]["last_used"], default=None)
+        if oldest is None:
+            break
+        evicted.append(_sessions.pop(oldest)["advisor"])
+    return evicted
+
+
+async def _get_session(session_id: str) -> dict:
+    """Look up (or create and open) this session's entry."""
+    async with _sessions_lock:
+        evicted = _pop_evictable(keep_id=session_id)
+        entry = _sessions.get(session_id)
+        if entry is None:
+            # interactive=False: no terminal printing or token streaming
+            # on the server - responses go back over HTTP instead
+            advisor = CareerPathAdvisor(interactive=False)
+            await advisor.__aenter__()
+            entry = {"advisor": advisor, "last_used": time.monotonic(),
+                     "turns": 0}
+            _sessions[session_id] = entry
+        entry["last_used"] = time.monotonic()
+    # Close evicted advisors outside the lock - closing can take a
+    # moment and shouldn't block other sessions
+    for advisor in evicted:
+        await advisor.__aexit__(None, None, None)
+    return entry
+
+
+async def _close_session(session_id: str) -> None:
+    """Drop a finished session and close its MCP connection."""
+    async with _sessions_lock:
+        entry = _sessions.pop(session_id, None)
+    if entry is not None:
+        await entry["advisor"].__aexit__(None, None, None)
+
+
+async def _research_and_advise(advisor: CareerPathAdvisor,
+                               profile_text: str) -> tuple:
+    """Run the Research + Advisor phases for a completed profile."""
+    resources = await advisor.research_learning_path(profile_text)
+    roadmap = await advisor.create_roadmap(profile_text, resources)
+    return resources, roadmap
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+@app.post("/turn", response_model=TurnResponse)
+async def turn(request: TurnRequest) -> TurnResponse:
+    """
+    Advance one session by one conversation turn.
+
+    While the profile is incomplete, the response carries the next
+    question. Once it completes - or the turn cap is reached, matching
+    the CLI's safety cap - the Research and Advisor phases run and the
+    response carries the roadmap (and the session is closed).
+    """
+    entry = await _get_session(request.session_id)
+    advisor = entry["advisor"]
+    entry["turns"] += 1
+    profile_response = await advisor.gather_profile(request.user_input)
+
+    complete = bool(_PROFILE_RE.search(profile_response))
+    if not complete and entry["turns"] < MAX_PROFILE_TURNS:
+        return TurnResponse(done=False, message=profile_response)
+
+    resources, roadmap = await _research_and_advise(advisor, profile_response)
+    await _close_session(request.session_id)
+    return TurnResponse(
+        done=True,
+        message=profile_response,
+        resources=resources,
+        roadmap=roadmap,
+    )
+
+
+@app.post("/advise", response_model=AdviseResponse)
+async def advise(request: AdviseRequest) -> AdviseResponse:
+    """
+    One-shot advice for callers who already have the full profile.
+
+    Skips the conversation entirely: the profile block is rendered
+    directly from the request fields, then Research + Advisor run.
+    """
+    profile_text = _format_profile_block(request.model_dump())
+    async with CareerPathAdvisor(interactive=False) as advisor:
+        resources, roadmap = await _research_and_advise(advisor, profile_text)
+    return AdviseResponse(resources=resources, roadmap=roadmap)